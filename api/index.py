@@ -7,100 +7,196 @@ from flask import Flask, jsonify, request
 from flask_cors import CORS
 import sys
 import os
+from typing import List
+
+import msgspec
+import orjson
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+# Load the scientific stack once at cold start so warm requests skip it
+import numpy as np
+from simulator import (
+    WeatherDerivativeSimulator,
+    create_example_contract,
+    create_example_historical_data
+)
+from config import (
+    ContractSpecification,
+    SimulationParameters,
+    MIN_SAMPLE_SIZE_FIT,
+    validate_contract
+)
+
 app = Flask(__name__)
-CORS(app)
+
+
+class ContractRequest(msgspec.Struct, kw_only=True):
+    """Contract terms as sent in a pricing request"""
+    location_lat: float = 0.0
+    location_lon: float = 0.0
+    location_name: str = 'Unknown'
+    observation_month: int
+    observation_year: int = 2025
+    rainfall_threshold_mm: float
+    strike_rainy_days: int
+    payout_rate_per_day: float
+    maximum_payout_days: int
+
+
+class PriceRequest(msgspec.Struct):
+    """Body of a /api/price request"""
+    contract: ContractRequest
+    historical_data: List[int]
+
+
+_PRICE_REQUEST_DECODER = msgspec.json.Decoder(PriceRequest)
+
+# Only the pricing endpoint is called cross-origin; GET endpoints skip CORS
+CORS(app, resources={r"/api/price": {"origins": "*"}})
+
+# Results carry NumPy scalars and integer-keyed percentile dicts
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _json_response(payload, status=200):
+    """Serialize payload with orjson into a JSON response"""
+    return app.response_class(
+        orjson.dumps(payload, option=_ORJSON_OPTIONS),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def _warm_up():
+    """Run one small pricing so SciPy's lazy initialisation happens at cold start"""
+    try:
+        WeatherDerivativeSimulator().price_contract(
+            create_example_contract(),
+            create_example_historical_data(),
+            sim_params=SimulationParameters(n_simulations=1000)
+        )
+    except Exception:
+        # Warm requests would hit the same failure; log it but keep serving
+        app.logger.exception('Warm-up pricing failed')
+
+
+_warm_up()
+
+# Static GET payloads never change, so encode them once at import
+_HOME_JSON = orjson.dumps({
+    'name': 'Weather Derivative Simulator API',
+    'version': '1.0.0',
+    'status': 'active',
+    'endpoints': {
+        '/api': 'API information',
+        '/api/health': 'Health check',
+        '/api/info': 'Simulator details',
+        '/api/price': 'Price contract (POST)'
+    }
+})
+
+_HEALTH_JSON = orjson.dumps({
+    'status': 'healthy',
+    'message': 'Weather Derivative Simulator API is running'
+})
+
+_INFO_JSON = orjson.dumps({
+    'name': 'Weather Derivative Simulator',
+    'description': 'Professional-grade pricing engine for rainfall-based derivatives',
+    'company': 'Cliff Horizon Pte. Ltd.',
+    'version': '1.0.0',
+    'features': [
+        'Distribution Fitting (Poisson, Negative Binomial, Empirical)',
+        'Monte Carlo Simulation (10,000+ scenarios)',
+        'Risk Metrics (VaR, CVaR, Trigger Frequency)',
+        'Complete Pricing Engine',
+        'Capital Requirement Calculation'
+    ]
+})
+
+
+def _static_response(body):
+    """Wrap pre-encoded JSON bytes in a response"""
+    return app.response_class(body, mimetype='application/json')
+
 
 @app.route('/')
 @app.route('/api')
 def home():
     """API root endpoint"""
-    return jsonify({
-        'name': 'Weather Derivative Simulator API',
-        'version': '1.0.0',
-        'status': 'active',
-        'endpoints': {
-            '/api': 'API information',
-            '/api/health': 'Health check',
-            '/api/info': 'Simulator details',
-            '/api/price': 'Price contract (POST)'
-        }
-    })
+    return _static_response(_HOME_JSON)
 
 @app.route('/api/health')
 def health():
     """Health check"""
-    return jsonify({
-        'status': 'healthy',
-        'message': 'Weather Derivative Simulator API is running'
-    })
+    return _static_response(_HEALTH_JSON)
 
 @app.route('/api/info')
 def info():
     """Simulator information"""
-    return jsonify({
-        'name': 'Weather Derivative Simulator',
-        'description': 'Professional-grade pricing engine for rainfall-based derivatives',
-        'company': 'Cliff Horizon Pte. Ltd.',
-        'version': '1.0.0',
-        'features': [
-            'Distribution Fitting (Poisson, Negative Binomial, Empirical)',
-            'Monte Carlo Simulation (10,000+ scenarios)',
-            'Risk Metrics (VaR, CVaR, Trigger Frequency)',
-            'Complete Pricing Engine',
-            'Capital Requirement Calculation'
-        ]
-    })
+    return _static_response(_INFO_JSON)
 
 @app.route('/api/price', methods=['POST'])
 def price_contract():
     """Price a weather derivative contract"""
     try:
-        from simulator import WeatherDerivativeSimulator
-        from config import ContractSpecification
-        import numpy as np
-
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No data provided'}), 400
-
-        contract_data = data.get('contract', {})
-        historical_data = data.get('historical_data', [])
-
-        if not contract_data or not historical_data:
-            return jsonify({'error': 'Missing contract or historical_data'}), 400
-
-        # Create contract
-        contract = ContractSpecification(
-            location_lat=contract_data.get('location_lat', 0.0),
-            location_lon=contract_data.get('location_lon', 0.0),
-            location_name=contract_data.get('location_name', 'Unknown'),
-            observation_month=contract_data.get('observation_month'),
-            observation_year=contract_data.get('observation_year', 2025),
-            rainfall_threshold_mm=contract_data.get('rainfall_threshold_mm'),
-            strike_rainy_days=contract_data.get('strike_rainy_days'),
-            payout_rate_per_day=contract_data.get('payout_rate_per_day'),
-            maximum_payout_days=contract_data.get('maximum_payout_days')
-        )
+        body = request.get_data()
+        if not body:
+            return jsonify({'success': False, 'error': 'No data provided'}), 400
+
+        try:
+            req = _PRICE_REQUEST_DECODER.decode(body)
+        except msgspec.DecodeError as e:
+            return jsonify({'success': False, 'error': f'Invalid request: {e}'}), 400
+
+        if not req.historical_data:
+            return jsonify({
+                'success': False,
+                'error': 'Missing contract or historical_data'
+            }), 400
+        if len(req.historical_data) < MIN_SAMPLE_SIZE_FIT:
+            return jsonify({
+                'success': False,
+                'error': f'Need at least {MIN_SAMPLE_SIZE_FIT} data points for distribution fitting'
+            }), 400
+        if min(req.historical_data) < 0:
+            return jsonify({
+                'success': False,
+                'error': 'Historical rainy day counts cannot be negative'
+            }), 400
+
+        # Contract terms are validated with ValueError, which is the client's
+        # error rather than the server's. Validation runs before pricing, so
+        # anything raised while pricing reaches the logged 500 path below
+        try:
+            contract = ContractSpecification(**msgspec.structs.asdict(req.contract))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+        is_valid, error_msg = validate_contract(contract)
+        if not is_valid:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid contract: {error_msg}'
+            }), 400
 
-        # Price contract
         simulator = WeatherDerivativeSimulator()
-        results = simulator.price_contract(contract, np.array(historical_data))
+        results = simulator.price_contract(
+            contract, np.asarray(req.historical_data, dtype=np.int64)
+        )
 
-        return jsonify({
+        return _json_response({
             'success': True,
             'results': results
         })
 
     except Exception as e:
-        import traceback
+        app.logger.exception('Pricing request failed')
         return jsonify({
             'success': False,
-            'error': str(e),
-            'trace': traceback.format_exc()
+            'error': str(e)
         }), 500
 
 # Export for Vercel
@@ -7,6 +7,7 @@ used throughout the simulator.
 
 from dataclasses import dataclass
 from typing import Optional
+import calendar
 import os
 
 
@@ -99,6 +100,7 @@ CANDIDATE_DISTRIBUTIONS = [
 
 # Thresholds for distribution selection
 VARIANCE_MEAN_RATIO_THRESHOLD = 1.2  # If > 1.2, prefer Negative Binomial over Poisson
+MIN_SAMPLE_SIZE_FIT = 5  # Minimum samples for any distribution fitting
 MIN_SAMPLE_SIZE_PARAMETRIC = 20  # Minimum samples for parametric fitting
 
 # Goodness-of-fit test
@@ -197,7 +199,7 @@ LOG_FILE = "weather_derivative_simulator.log"
 # DATA CLASSES FOR TYPE SAFETY
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class ContractSpecification:
     """User-input contract terms"""
     location_lat: float
@@ -240,7 +242,7 @@ class ContractSpecification:
         return self.maximum_payout_days * self.payout_rate_per_day
 
 
-@dataclass
+@dataclass(slots=True)
 class PricingParameters:
     """Pricing model parameters"""
     volatility_loading: float = DEFAULT_VOLATILITY_LOADING
@@ -263,13 +265,14 @@ class PricingParameters:
             raise ValueError("Cost of capital must be between 0 and 1")
 
 
-@dataclass
+@dataclass(slots=True)
 class SimulationParameters:
     """Monte Carlo simulation parameters"""
     n_simulations: int = DEFAULT_N_SIMULATIONS
     random_seed: int = DEFAULT_RANDOM_SEED
     method: str = DEFAULT_SIMULATION_METHOD
     bootstrap_weight: float = DEFAULT_BOOTSTRAP_WEIGHT
+    store_samples: bool = True  # False keeps only summary statistics
     
     def __post_init__(self):
         """Validate simulation parameters"""
@@ -287,10 +290,20 @@ class SimulationParameters:
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Month lengths for the observation years contracts are written for
+_DAYS_IN_MONTH = {
+    (month, year): calendar.monthrange(year, month)[1]
+    for year in range(2025, 2050)
+    for month in range(1, 13)
+}
+
+
 def get_days_in_month(month: int, year: int) -> int:
     """Get number of days in a given month"""
-    import calendar
-    return calendar.monthrange(year, month)[1]
+    days = _DAYS_IN_MONTH.get((month, year))
+    if days is None:
+        days = calendar.monthrange(year, month)[1]
+    return days
 
 
 def validate_contract(contract: ContractSpecification) -> tuple[bool, Optional[str]]:
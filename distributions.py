@@ -5,25 +5,46 @@ Fits probability distributions to historical rainy day counts.
 Supports Poisson, Negative Binomial, and Empirical distributions.
 """
 
+from abc import ABC, abstractmethod
 import numpy as np
 from scipy import stats
-from scipy.optimize import minimize
-from typing import Dict, Tuple, Optional, List
-from dataclasses import dataclass
+from scipy.optimize import brentq
+from scipy.special import chdtrc, digamma, gammaln, xlog1py, xlogy
+from typing import ClassVar, Dict, Iterator, Tuple, Optional, List, Union
+from dataclasses import dataclass, field
+import dataclasses
+import functools
+import math
 import warnings
 
 from config import (
+    ContractSpecification,
     CANDIDATE_DISTRIBUTIONS,
     VARIANCE_MEAN_RATIO_THRESHOLD,
+    MIN_SAMPLE_SIZE_FIT,
     MIN_SAMPLE_SIZE_PARAMETRIC,
     GOF_SIGNIFICANCE_LEVEL
 )
 
 
+# Upper tail probability left outside the cached pmf/cdf tables
+_SUPPORT_TAIL_PROBABILITY = 1e-10
+
+# Search bounds for the Negative Binomial dispersion n and probability p
+_NB_N_BOUNDS = (0.1, 1000.0)
+_NB_P_BOUNDS = (0.01, 0.99)
+
+
 @dataclass
-class DistributionFit:
-    """Results of distribution fitting"""
-    distribution_type: str
+class DistributionFit(ABC):
+    """
+    Results of distribution fitting
+    
+    Abstract base for PoissonFit, NegativeBinomialFit and EmpiricalFit; each
+    subclass implements its own sampling, moments and support tables, and
+    sets distribution_type as the default of a keyword-only field.
+    """
+    distribution_type: str = field(kw_only=True)
     parameters: Dict[str, float]
     aic: float
     bic: float
@@ -31,118 +52,383 @@ class DistributionFit:
     gof_statistic: float
     gof_pvalue: float
     is_good_fit: bool
+    _tables_cache: Optional[Tuple[tuple, np.ndarray, np.ndarray]] = field(default=None, init=False, repr=False, compare=False)
+    _rng: Optional[np.random.Generator] = field(default=None, init=False, repr=False, compare=False)
     
-    def pmf(self, k: int) -> float:
-        """Probability mass function"""
-        if self.distribution_type == 'poisson':
-            return stats.poisson.pmf(k, mu=self.parameters['lambda'])
-        elif self.distribution_type == 'negative_binomial':
-            return stats.nbinom.pmf(k, n=self.parameters['n'], p=self.parameters['p'])
-        elif self.distribution_type == 'empirical':
-            # Return empirical probability
-            return self.parameters.get(f'p_{k}', 0.0)
-        else:
-            raise ValueError(f"Unknown distribution: {self.distribution_type}")
-    
-    def cdf(self, k: int) -> float:
-        """Cumulative distribution function"""
-        if self.distribution_type == 'poisson':
-            return stats.poisson.cdf(k, mu=self.parameters['lambda'])
-        elif self.distribution_type == 'negative_binomial':
-            return stats.nbinom.cdf(k, n=self.parameters['n'], p=self.parameters['p'])
-        elif self.distribution_type == 'empirical':
-            # Cumulative sum of empirical probabilities up to k
-            cum_prob = 0.0
-            for i in range(k + 1):
-                cum_prob += self.parameters.get(f'p_{i}', 0.0)
-            return cum_prob
-        else:
-            raise ValueError(f"Unknown distribution: {self.distribution_type}")
+    # Set once the size=1 rvs warning has been shown
+    _warned_scalar_rvs: ClassVar[bool] = False
+    
+    @abstractmethod
+    def _build_tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        """pmf and cdf over the integer support 0..k_max"""
+    
+    @abstractmethod
+    def _pmf_outside_table(self, k: np.ndarray) -> Union[float, np.ndarray]:
+        """pmf for k when some values fall outside the cached table"""
+    
+    @abstractmethod
+    def _cdf_outside_table(self, k: np.ndarray) -> Union[float, np.ndarray]:
+        """cdf for k when some values fall outside the cached table"""
+    
+    @abstractmethod
+    def _ppf_beyond_table(self, q: float) -> int:
+        """ppf for q above the last cached cdf value"""
+    
+    @abstractmethod
+    def _sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Draw size variates from rng"""
+    
+    def _tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        """pmf and cdf tables, evaluated once per set of parameters"""
+        # Stored as one tuple with the parameters they were built from, so a
+        # concurrent reader never sees one table without the other and an
+        # edit to parameters rebuilds them
+        snapshot = tuple(self.parameters.items())
+        cached = self._tables_cache
+        if cached is None or cached[0] != snapshot:
+            cached = (snapshot, *self._build_tables())
+            self._tables_cache = cached
+        return cached[1], cached[2]
+    
+    @property
+    def pmf_table(self) -> np.ndarray:
+        """pmf at 0..k_max, computed on first use; index with the day count"""
+        return self._tables()[0]
+    
+    @property
+    def cdf_table(self) -> np.ndarray:
+        """cdf at 0..k_max, computed on first use; index with the day count"""
+        return self._tables()[1]
+    
+    def pmf(self, k: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
+        """Probability mass function (scalar or array of k)"""
+        pmf_table, _ = self._tables()
+        k = np.asarray(k)
+        if ((k >= 0) & (k < len(pmf_table))).all():
+            return pmf_table[k]
+        return self._pmf_outside_table(k)
+    
+    def cdf(self, k: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
+        """Cumulative distribution function (scalar or array of k)"""
+        _, cdf_table = self._tables()
+        k = np.asarray(k)
+        if ((k >= 0) & (k < len(cdf_table))).all():
+            return cdf_table[k]
+        return self._cdf_outside_table(k)
     
     def ppf(self, q: float) -> int:
         """Percent point function (inverse CDF)"""
-        if self.distribution_type == 'poisson':
-            return int(stats.poisson.ppf(q, mu=self.parameters['lambda']))
-        elif self.distribution_type == 'negative_binomial':
-            return int(stats.nbinom.ppf(q, n=self.parameters['n'], p=self.parameters['p']))
-        elif self.distribution_type == 'empirical':
-            # Find the smallest k where CDF(k) >= q
-            for k in range(100):  # Reasonable upper limit
-                if self.cdf(k) >= q:
-                    return k
-            return 99  # Fallback
-        else:
-            raise ValueError(f"Unknown distribution: {self.distribution_type}")
+        _, cdf_table = self._tables()
+        # Smallest k where CDF(k) >= q
+        k = int(np.searchsorted(cdf_table, q))
+        if k < len(cdf_table):
+            return k
+        return self._ppf_beyond_table(q)
     
-    def rvs(self, size: int = 1, random_state: Optional[int] = None) -> np.ndarray:
-        """Generate random variates"""
-        if self.distribution_type == 'poisson':
-            return np.random.RandomState(random_state).poisson(
-                lam=self.parameters['lambda'], size=size
-            )
-        elif self.distribution_type == 'negative_binomial':
-            return np.random.RandomState(random_state).negative_binomial(
-                n=self.parameters['n'], p=self.parameters['p'], size=size
-            )
-        elif self.distribution_type == 'empirical':
-            # Sample from empirical distribution
-            values = []
-            probabilities = []
-            for key, value in self.parameters.items():
-                if key.startswith('p_'):
-                    k = int(key.split('_')[1])
-                    values.append(k)
-                    probabilities.append(value)
-            
-            if not values:
-                raise ValueError("Empirical distribution has no probabilities")
-            
-            # Normalize probabilities
-            probabilities = np.array(probabilities)
-            probabilities = probabilities / probabilities.sum()
-            
-            return np.random.RandomState(random_state).choice(
-                values, size=size, p=probabilities
+    def rvs(
+        self,
+        size: int = 1,
+        random_state: Union[int, np.random.Generator, None] = None
+    ) -> np.ndarray:
+        """
+        Generate random variates
+        
+        random_state may be a seed (reproducible per call), a Generator
+        (used as-is), or None to draw from a generator cached on the fit.
+        Draw all scenarios in one call (or use rvs_batch/iter_rvs); size=1
+        calls in a loop pay the generator and dispatch cost per variate and
+        trigger a one-time warning.
+        """
+        if size == 1 and not DistributionFit._warned_scalar_rvs:
+            DistributionFit._warned_scalar_rvs = True
+            warnings.warn(
+                "rvs(size=1) draws a single variate per call; draw all "
+                "scenarios at once with rvs(size=n) or rvs_batch(n)"
             )
-        else:
-            raise ValueError(f"Unknown distribution: {self.distribution_type}")
+        return self._sample(self._generator(random_state), size)
+    
+    def rvs_batch(
+        self,
+        n: int,
+        random_state: Union[int, np.random.Generator, None] = None
+    ) -> np.ndarray:
+        """Generate n random variates in a single draw"""
+        return self._sample(self._generator(random_state), n)
+    
+    def iter_rvs(
+        self,
+        batch_size: int = 10000,
+        random_state: Union[int, np.random.Generator, None] = None
+    ) -> Iterator[int]:
+        """
+        Endless iterator over random variates for scenario-by-scenario loops
+        
+        Variates are drawn batch_size at a time from one generator, so each
+        next() is an array lookup rather than a fresh draw.
+        """
+        rng = self._generator(random_state)
+        while True:
+            yield from self._sample(rng, batch_size).tolist()
+    
+    def _generator(
+        self,
+        random_state: Union[int, np.random.Generator, None]
+    ) -> np.random.Generator:
+        """Generator for random_state, reusing the cached one for None"""
+        if random_state is None:
+            if self._rng is None:
+                self._rng = np.random.default_rng()
+            return self._rng
+        return np.random.default_rng(random_state)
+    
+    def simulate_payouts(
+        self,
+        contract: ContractSpecification,
+        n_simulations: int,
+        random_state: Union[int, np.random.Generator, None] = None
+    ) -> np.ndarray:
+        """
+        Sample rainy day counts and convert them straight to contract payouts
+        
+        The excess-over-strike capping is applied in place on the sampled
+        counts, so the only arrays allocated are the sample and the payouts.
+        
+        Parameters:
+        -----------
+        contract : ContractSpecification
+            Contract terms (strike, cap, payout rate)
+        n_simulations : int
+            Number of scenarios
+        random_state : int, Generator or None
+            As for rvs()
+        
+        Returns:
+        --------
+        payouts : np.ndarray
+            Simulated payout per scenario
+        """
+        excess_days = self.rvs(size=n_simulations, random_state=random_state)
+        np.subtract(excess_days, contract.strike_rainy_days, out=excess_days)
+        np.clip(excess_days, 0, contract.maximum_payout_days, out=excess_days)
+        return excess_days * float(contract.payout_rate_per_day)
     
+    @abstractmethod
     def mean(self) -> float:
         """Expected value"""
-        if self.distribution_type == 'poisson':
-            return self.parameters['lambda']
-        elif self.distribution_type == 'negative_binomial':
-            n = self.parameters['n']
-            p = self.parameters['p']
-            return n * (1 - p) / p
-        elif self.distribution_type == 'empirical':
-            mean_val = 0.0
-            for key, prob in self.parameters.items():
-                if key.startswith('p_'):
-                    k = int(key.split('_')[1])
-                    mean_val += k * prob
-            return mean_val
-        else:
-            raise ValueError(f"Unknown distribution: {self.distribution_type}")
     
+    @abstractmethod
     def variance(self) -> float:
         """Variance"""
-        if self.distribution_type == 'poisson':
-            return self.parameters['lambda']
-        elif self.distribution_type == 'negative_binomial':
-            n = self.parameters['n']
-            p = self.parameters['p']
-            return n * (1 - p) / (p ** 2)
-        elif self.distribution_type == 'empirical':
-            mean_val = self.mean()
-            variance_val = 0.0
-            for key, prob in self.parameters.items():
-                if key.startswith('p_'):
-                    k = int(key.split('_')[1])
-                    variance_val += ((k - mean_val) ** 2) * prob
-            return variance_val
-        else:
-            raise ValueError(f"Unknown distribution: {self.distribution_type}")
+
+
+@dataclass
+class _ParametricFit(DistributionFit):
+    """Shared table and tail handling for the scipy-backed families"""
+    
+    @abstractmethod
+    def _scipy_dist(self):
+        """Frozen scipy distribution with the fitted parameters"""
+    
+    def _build_tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Tables stop where the upper tail drops below _SUPPORT_TAIL_PROBABILITY
+        dist = self._scipy_dist()
+        k_max = int(dist.ppf(1 - _SUPPORT_TAIL_PROBABILITY))
+        # One special-function pass for the cdf; the pmf is its first
+        # difference
+        cdf_table = dist.cdf(np.arange(k_max + 1))
+        pmf_table = np.diff(cdf_table, prepend=0.0)
+        return pmf_table, cdf_table
+    
+    def _pmf_outside_table(self, k: np.ndarray) -> Union[float, np.ndarray]:
+        return self._scipy_dist().pmf(k)
+    
+    def _cdf_outside_table(self, k: np.ndarray) -> Union[float, np.ndarray]:
+        return self._scipy_dist().cdf(k)
+    
+    def _ppf_beyond_table(self, q: float) -> int:
+        return int(self._scipy_dist().ppf(q))
+
+
+@dataclass
+class PoissonFit(_ParametricFit):
+    """Poisson fit, parameters {'lambda'}"""
+    distribution_type: str = field(default='poisson', kw_only=True)
+    
+    def _scipy_dist(self):
+        return stats.poisson(mu=self.parameters['lambda'])
+    
+    def _sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.poisson(lam=self.parameters['lambda'], size=size)
+    
+    def mean(self) -> float:
+        """Expected value"""
+        return self.parameters['lambda']
+    
+    def variance(self) -> float:
+        """Variance"""
+        return self.parameters['lambda']
+
+
+@dataclass
+class NegativeBinomialFit(_ParametricFit):
+    """Negative Binomial fit, parameters {'n', 'p'}"""
+    distribution_type: str = field(default='negative_binomial', kw_only=True)
+    
+    def _scipy_dist(self):
+        return stats.nbinom(n=self.parameters['n'], p=self.parameters['p'])
+    
+    def _sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.negative_binomial(
+            n=self.parameters['n'], p=self.parameters['p'], size=size
+        )
+    
+    def mean(self) -> float:
+        """Expected value"""
+        n = self.parameters['n']
+        p = self.parameters['p']
+        return n * (1 - p) / p
+    
+    def variance(self) -> float:
+        """Variance"""
+        n = self.parameters['n']
+        p = self.parameters['p']
+        return n * (1 - p) / (p ** 2)
+
+
+@dataclass
+class EmpiricalFit(DistributionFit):
+    """
+    Empirical fit over the observed values
+    
+    empirical_support holds the distinct observed values in increasing order
+    and empirical_probs their relative frequencies; parameters carries the
+    same probabilities keyed 'p_<k>' for reporting.
+    """
+    distribution_type: str = field(default='empirical', kw_only=True)
+    empirical_support: np.ndarray = field(repr=False, compare=False)
+    empirical_probs: np.ndarray = field(repr=False, compare=False)
+    _cum_probs: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        """Cumulative probabilities for ppf()"""
+        self.empirical_support = np.asarray(self.empirical_support, dtype=np.int64)
+        self.empirical_probs = np.asarray(self.empirical_probs, dtype=np.float64)
+        self._cum_probs = np.cumsum(self.empirical_probs)
+    
+    def _build_tables(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Tables cover 0 up to the largest observed value
+        pmf_table = np.zeros(self.empirical_support.max() + 1)
+        pmf_table[self.empirical_support] = self.empirical_probs
+        return pmf_table, np.cumsum(pmf_table)
+    
+    def _pmf_outside_table(self, k: np.ndarray) -> Union[float, np.ndarray]:
+        # No empirical mass outside the observed range
+        pmf_table, _ = self._tables()
+        in_table = (k >= 0) & (k < len(pmf_table))
+        return np.where(in_table, pmf_table[np.clip(k, 0, len(pmf_table) - 1)], 0.0)[()]
+    
+    def _cdf_outside_table(self, k: np.ndarray) -> Union[float, np.ndarray]:
+        # Below the support the cdf is 0, above it stays at the last value
+        _, cdf_table = self._tables()
+        return np.where(k < 0, 0.0, cdf_table[np.clip(k, 0, len(cdf_table) - 1)])[()]
+    
+    def _ppf_beyond_table(self, q: float) -> int:
+        # No empirical mass above the largest observed value
+        return int(self.empirical_support[-1])
+    
+    def ppf(self, q: float) -> int:
+        """Percent point function (inverse CDF)"""
+        # Smallest observed k where CDF(k) >= q, capped at the largest value
+        idx = int(np.searchsorted(self._cum_probs, q))
+        return int(self.empirical_support[min(idx, len(self.empirical_support) - 1)])
+    
+    def _sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        if len(self.empirical_support) == 0:
+            raise ValueError("Empirical distribution has no probabilities")
+        return rng.choice(
+            self.empirical_support,
+            size=size,
+            p=self.empirical_probs / self.empirical_probs.sum()
+        )
+    
+    def mean(self) -> float:
+        """Expected value"""
+        return float(np.dot(self.empirical_support, self.empirical_probs))
+    
+    def variance(self) -> float:
+        """Variance"""
+        deviations = self.empirical_support - self.mean()
+        return float(np.dot(deviations ** 2, self.empirical_probs))
+
+
+def _poisson_pmf(k: np.ndarray, lam, log_factorials: np.ndarray) -> np.ndarray:
+    """Poisson pmf from its log form, given log(k!) for each k"""
+    return np.exp(xlogy(k, lam) - lam - log_factorials)
+
+
+def _nbinom_pmf(k: np.ndarray, n: float, p: float, log_factorials: np.ndarray) -> np.ndarray:
+    """Negative Binomial pmf from its log form, given log(k!) for each k"""
+    return np.exp(
+        gammaln(k + n) - gammaln(n) - log_factorials
+        + n * np.log(p) + xlog1py(k, -p)
+    )
+
+
+def _chi_squared_from_counts(
+    observed: np.ndarray,
+    expected: np.ndarray,
+    n_fitted_params: int
+) -> Tuple[float, float]:
+    """
+    Chi-squared test on per-value observed and expected frequencies
+    
+    Parameters:
+    -----------
+    observed : np.ndarray
+        Observed count of each integer value over the data range
+    expected : np.ndarray
+        Expected count of each value under the fitted distribution
+    n_fitted_params : int
+        Number of parameters estimated from the data
+    
+    Returns:
+        (chi2_statistic, p_value)
+    """
+    # Combine bins with expected < 5: walking left to right, a bin closes
+    # as soon as its expected count reaches 5. Each closing point is one
+    # searchsorted on the cumulative expected counts.
+    cum_expected = np.cumsum(expected)
+    bin_ends = []
+    closed_expected = 0.0
+    while True:
+        end = int(np.searchsorted(cum_expected, closed_expected + 5))
+        if end >= len(cum_expected):
+            break
+        bin_ends.append(end)
+        closed_expected = cum_expected[end]
+    
+    # Remaining tail joins the last bin if it holds observations,
+    # otherwise it is dropped
+    tail_start = bin_ends[-1] + 1 if bin_ends else 0
+    if tail_start > 0 and observed[tail_start:].sum() == 0:
+        observed = observed[:tail_start]
+        expected = expected[:tail_start]
+    
+    bin_starts = [0] + [end + 1 for end in bin_ends[:-1]]
+    observed_combined = np.add.reduceat(observed, bin_starts)
+    expected_combined = np.add.reduceat(expected, bin_starts)
+    
+    # Chi-squared statistic
+    chi2_stat = np.sum((observed_combined - expected_combined) ** 2 / expected_combined)
+    
+    # Degrees of freedom (bins - 1 - number of estimated parameters)
+    df = len(observed_combined) - 1 - n_fitted_params
+    df = max(df, 1)  # Ensure at least 1 degree of freedom
+    
+    # P-value
+    p_value = float(chdtrc(df, chi2_stat))
+    
+    return chi2_stat, p_value
 
 
 class DistributionFitter:
@@ -159,36 +445,49 @@ class DistributionFitter:
         """
         self.data = np.array(data, dtype=int)
         self.n_samples = len(self.data)
-        self.mean = np.mean(self.data)
-        self.variance = np.var(self.data, ddof=1)  # Sample variance
-        self.std = np.std(self.data, ddof=1)
+        self.mean = float(np.mean(self.data))
+        self.variance = float(np.var(self.data, ddof=1))  # Sample variance
+        self.std = float(np.std(self.data, ddof=1))
         
         # Validate data
-        if self.n_samples < 5:
-            raise ValueError("Need at least 5 data points for distribution fitting")
+        if self.n_samples < MIN_SAMPLE_SIZE_FIT:
+            raise ValueError(f"Need at least {MIN_SAMPLE_SIZE_FIT} data points for distribution fitting")
         if np.any(self.data < 0):
             raise ValueError("Data contains negative values")
+        
+        # Integer range covered by the data, used for goodness-of-fit bins
+        self._gof_support = np.arange(self.data.min(), self.data.max() + 1)
+        self._gof_log_factorials = gammaln(self._gof_support + 1)
+        
+        # Data-only terms, constant across fits and optimizer steps
+        self._log_n = math.log(self.n_samples)
+        self._data_sum = float(self.data.sum())
+        self._sum_log_factorials = float(np.sum(gammaln(self.data + 1)))
     
     def fit_poisson(self) -> DistributionFit:
         """Fit Poisson distribution"""
         # MLE for Poisson: Î» = sample mean
         lambda_mle = self.mean
         
-        # Log-likelihood
-        log_likelihood = np.sum(stats.poisson.logpmf(self.data, mu=lambda_mle))
+        # Log-likelihood: sum(x)*log(lambda) - N*lambda - sum(log(x!))
+        log_likelihood = (
+            xlogy(self._data_sum, lambda_mle)
+            - self.n_samples * lambda_mle
+            - self._sum_log_factorials
+        )
         
         # AIC and BIC (1 parameter)
         k_params = 1
         aic = 2 * k_params - 2 * log_likelihood
-        bic = k_params * np.log(self.n_samples) - 2 * log_likelihood
+        bic = k_params * self._log_n - 2 * log_likelihood
         
         # Goodness-of-fit test (Chi-squared)
         gof_stat, gof_pval = self._chi_squared_test(
-            lambda k: stats.poisson.pmf(k, mu=lambda_mle)
+            _poisson_pmf(self._gof_support, lambda_mle, self._gof_log_factorials),
+            n_fitted_params=k_params
         )
         
-        return DistributionFit(
-            distribution_type='poisson',
+        return PoissonFit(
             parameters={'lambda': lambda_mle},
             aic=aic,
             bic=bic,
@@ -198,54 +497,137 @@ class DistributionFitter:
             is_good_fit=(gof_pval > GOF_SIGNIFICANCE_LEVEL)
         )
     
+    @staticmethod
+    def fit_poisson_batch(data_matrix: np.ndarray) -> List[DistributionFit]:
+        """
+        Fit a Poisson distribution to each row of a data matrix
+        
+        Gives the same fits as DistributionFitter(row).fit_poisson() for
+        every row, with the likelihoods and pmf evaluated for all rows at once.
+        
+        Parameters:
+        -----------
+        data_matrix : np.ndarray
+            (M, N) array, one row of N rainy day counts per location/contract
+        
+        Returns:
+        --------
+        fits : List[DistributionFit]
+            M Poisson fits, in row order
+        """
+        data_matrix = np.array(data_matrix, dtype=int)
+        if data_matrix.ndim != 2:
+            raise ValueError("data_matrix must be two-dimensional (M, N)")
+        n_samples = data_matrix.shape[1]
+        if n_samples < MIN_SAMPLE_SIZE_FIT:
+            raise ValueError(f"Need at least {MIN_SAMPLE_SIZE_FIT} data points for distribution fitting")
+        if np.any(data_matrix < 0):
+            raise ValueError("Data contains negative values")
+        
+        # MLE for Poisson: Î» = row mean
+        data_sums = data_matrix.sum(axis=1).astype(float)
+        lambdas = data_sums / n_samples
+        
+        # Log-likelihood: sum(x)*log(lambda) - N*lambda - sum(log(x!))
+        log_likelihoods = (
+            xlogy(data_sums, lambdas)
+            - n_samples * lambdas
+            - gammaln(data_matrix + 1).sum(axis=1)
+        )
+        
+        # AIC and BIC (1 parameter)
+        k_params = 1
+        aics = 2 * k_params - 2 * log_likelihoods
+        bics = k_params * math.log(n_samples) - 2 * log_likelihoods
+        
+        # Expected pmf for every row over 0..max, sliced per row below
+        support = np.arange(data_matrix.max() + 1)
+        pmf_matrix = _poisson_pmf(support, lambdas[:, None], gammaln(support + 1))
+        row_mins = data_matrix.min(axis=1)
+        row_maxs = data_matrix.max(axis=1)
+        
+        fits = []
+        for i, row in enumerate(data_matrix):
+            low, high = row_mins[i], row_maxs[i]
+            observed = np.bincount(row - low, minlength=high - low + 1).astype(float)
+            gof_stat, gof_pval = _chi_squared_from_counts(
+                observed,
+                pmf_matrix[i, low:high + 1] * n_samples,
+                n_fitted_params=k_params
+            )
+            fits.append(PoissonFit(
+                parameters={'lambda': float(lambdas[i])},
+                aic=float(aics[i]),
+                bic=float(bics[i]),
+                log_likelihood=float(log_likelihoods[i]),
+                gof_statistic=gof_stat,
+                gof_pvalue=gof_pval,
+                is_good_fit=(gof_pval > GOF_SIGNIFICANCE_LEVEL)
+            ))
+        
+        return fits
+    
     def fit_negative_binomial(self) -> DistributionFit:
         """Fit Negative Binomial distribution"""
-        # Method of moments for initial guess
-        if self.variance <= self.mean:
-            # Variance not greater than mean, fall back to Poisson-like parameters
-            p_init = 0.5
-            n_init = self.mean
+        # Profile likelihood: for fixed n the MLE of p is n / (n + mean), so
+        # only the dispersion n needs solving, from the 1-D score equation
+        # sum(digamma(x + n)) - N*digamma(n) + N*log(n / (n + mean)) = 0
+        data = self.data
+        n_obs = self.n_samples
+        sample_mean = self.mean
+        
+        def profile_score(n):
+            return (
+                np.sum(digamma(data + n))
+                - n_obs * digamma(n)
+                + n_obs * np.log(n / (n + sample_mean))
+            )
+        
+        # Keep n inside its bounds and narrow them so p = n / (n + mean)
+        # stays inside the p bounds
+        p_low, p_high = _NB_P_BOUNDS
+        n_low = max(_NB_N_BOUNDS[0], sample_mean * p_low / (1 - p_low))
+        n_high = min(_NB_N_BOUNDS[1], sample_mean * p_high / (1 - p_high))
+        if n_high < n_low:
+            # Mean too small (e.g. an all-zero history) for any n in bounds
+            # to keep p below its upper bound; p is clipped there, where the
+            # all-zero likelihood n * N * log(p) is largest at the smallest n
+            n_mle = n_low
+        elif profile_score(n_low) <= 0:
+            # Likelihood already decreasing at the lower bound
+            n_mle = n_low
+        elif profile_score(n_high) >= 0:
+            # Likelihood still increasing at the upper bound (variance <= mean,
+            # the Poisson limit)
+            n_mle = n_high
         else:
-            p_init = self.mean / self.variance
-            n_init = (self.mean ** 2) / (self.variance - self.mean)
-        
-        # MLE optimization
-        def neg_log_likelihood(params):
-            n, p = params
-            if n <= 0 or p <= 0 or p >= 1:
-                return np.inf
-            try:
-                ll = np.sum(stats.nbinom.logpmf(self.data, n=n, p=p))
-                return -ll
-            except:
-                return np.inf
-        
-        # Optimize
-        result = minimize(
-            neg_log_likelihood,
-            x0=[n_init, p_init],
-            bounds=[(0.1, 1000), (0.01, 0.99)],
-            method='L-BFGS-B'
-        )
+            n_mle = brentq(profile_score, n_low, n_high)
         
-        if not result.success:
-            warnings.warn("Negative Binomial optimization did not converge")
+        p_mle = min(max(n_mle / (n_mle + sample_mean), p_low), p_high)
         
-        n_mle, p_mle = result.x
-        log_likelihood = -result.fun
+        # Closed-form NB log-likelihood at the estimate
+        log_likelihood = float(
+            np.sum(gammaln(data + n_mle))
+            - n_obs * gammaln(n_mle)
+            - self._sum_log_factorials
+            + n_obs * n_mle * np.log(p_mle)
+            + xlog1py(self._data_sum, -p_mle)
+        )
+        n_mle = float(n_mle)
+        p_mle = float(p_mle)
         
         # AIC and BIC (2 parameters)
         k_params = 2
         aic = 2 * k_params - 2 * log_likelihood
-        bic = k_params * np.log(self.n_samples) - 2 * log_likelihood
+        bic = k_params * self._log_n - 2 * log_likelihood
         
         # Goodness-of-fit test
         gof_stat, gof_pval = self._chi_squared_test(
-            lambda k: stats.nbinom.pmf(k, n=n_mle, p=p_mle)
+            _nbinom_pmf(self._gof_support, n_mle, p_mle, self._gof_log_factorials),
+            n_fitted_params=k_params
         )
         
-        return DistributionFit(
-            distribution_type='negative_binomial',
+        return NegativeBinomialFit(
             parameters={'n': n_mle, 'p': p_mle},
             aic=aic,
             bic=bic,
@@ -267,20 +649,21 @@ class DistributionFitter:
             parameters[f'p_{val}'] = float(prob)
         
         # Log-likelihood
-        log_likelihood = np.sum(np.log(counts / self.n_samples) * counts)
+        log_likelihood = float(xlogy(counts, probabilities).sum())
         
         # AIC and BIC (n_unique parameters)
         k_params = len(unique_values)
         aic = 2 * k_params - 2 * log_likelihood
-        bic = k_params * np.log(self.n_samples) - 2 * log_likelihood
+        bic = k_params * self._log_n - 2 * log_likelihood
         
         # Goodness-of-fit (perfect fit by definition)
         gof_stat = 0.0
         gof_pval = 1.0
         
-        return DistributionFit(
-            distribution_type='empirical',
+        return EmpiricalFit(
             parameters=parameters,
+            empirical_support=unique_values,
+            empirical_probs=probabilities,
             aic=aic,
             bic=bic,
             log_likelihood=log_likelihood,
@@ -289,72 +672,33 @@ class DistributionFitter:
             is_good_fit=True
         )
     
-    def _chi_squared_test(self, pmf_func) -> Tuple[float, float]:
+    def _chi_squared_test(
+        self,
+        expected_pmf: np.ndarray,
+        n_fitted_params: int
+    ) -> Tuple[float, float]:
         """
         Perform Chi-squared goodness-of-fit test
         
+        Parameters:
+        -----------
+        expected_pmf : np.ndarray
+            Fitted pmf evaluated over the data range (self._gof_support)
+        n_fitted_params : int
+            Number of parameters estimated from the data
+        
         Returns:
             (chi2_statistic, p_value)
         """
-        # Bin the data
-        min_val = int(self.data.min())
-        max_val = int(self.data.max())
-        
         # Observed frequencies
-        observed = np.zeros(max_val - min_val + 1)
-        for val in self.data:
-            observed[val - min_val] += 1
+        observed = np.bincount(
+            self.data - self._gof_support[0], minlength=len(self._gof_support)
+        ).astype(float)
         
         # Expected frequencies
-        expected = np.zeros(max_val - min_val + 1)
-        for i, k in enumerate(range(min_val, max_val + 1)):
-            expected[i] = pmf_func(k) * self.n_samples
+        expected = expected_pmf * self.n_samples
         
-        # Combine bins with expected < 5
-        observed_combined = []
-        expected_combined = []
-        
-        current_obs = 0
-        current_exp = 0
-        
-        for obs, exp in zip(observed, expected):
-            current_obs += obs
-            current_exp += exp
-            
-            if current_exp >= 5:
-                observed_combined.append(current_obs)
-                expected_combined.append(current_exp)
-                current_obs = 0
-                current_exp = 0
-        
-        # Add remaining
-        if current_obs > 0:
-            if len(observed_combined) > 0:
-                observed_combined[-1] += current_obs
-                expected_combined[-1] += current_exp
-            else:
-                observed_combined.append(current_obs)
-                expected_combined.append(current_exp)
-        
-        observed_combined = np.array(observed_combined)
-        expected_combined = np.array(expected_combined)
-        
-        # Chi-squared statistic
-        chi2_stat = np.sum((observed_combined - expected_combined) ** 2 / expected_combined)
-        
-        # Degrees of freedom (bins - 1 - number of estimated parameters)
-        # For Poisson: 1 parameter, for NegBin: 2 parameters
-        if 'lambda' in str(pmf_func):
-            df = len(observed_combined) - 1 - 1
-        else:
-            df = len(observed_combined) - 1 - 2
-        
-        df = max(df, 1)  # Ensure at least 1 degree of freedom
-        
-        # P-value
-        p_value = 1 - stats.chi2.cdf(chi2_stat, df)
-        
-        return chi2_stat, p_value
+        return _chi_squared_from_counts(observed, expected, n_fitted_params)
     
     def select_best_distribution(self) -> DistributionFit:
         """
@@ -414,6 +758,11 @@ def fit_distribution(data: np.ndarray, method: str = 'auto') -> DistributionFit:
     """
     Fit a probability distribution to rainy day count data
     
+    Fits are memoised on the data values and method, so repeated calls with
+    the same history (e.g. a sweep over strikes) skip refitting. Each call
+    still returns its own DistributionFit with its own parameters dict, so
+    changes a caller makes to the result do not reach later callers.
+    
     Parameters:
     -----------
     data : np.ndarray
@@ -425,15 +774,36 @@ def fit_distribution(data: np.ndarray, method: str = 'auto') -> DistributionFit:
     --------
     DistributionFit object
     """
-    fitter = DistributionFitter(data)
+    data = np.ascontiguousarray(data, dtype=int).ravel()
+    cached_fit = _fit_distribution_cached(data.tobytes(), method)
+    # Fresh fit per call: the generator and tables start empty and the
+    # parameters dict is copied; the empirical arrays are read-only
+    return dataclasses.replace(cached_fit, parameters=dict(cached_fit.parameters))
+
+
+@functools.lru_cache(maxsize=128)
+def _fit_distribution_cached(data_bytes: bytes, method: str) -> DistributionFit:
+    """
+    fit_distribution keyed on the raw bytes of the int data array
+    
+    The returned fit is shared between calls and only used as a template
+    for the copies fit_distribution hands out.
+    """
+    fitter = DistributionFitter(np.frombuffer(data_bytes, dtype=int))
     
     if method == 'auto':
-        return fitter.select_best_distribution()
+        fit = fitter.select_best_distribution()
     elif method == 'poisson':
-        return fitter.fit_poisson()
+        fit = fitter.fit_poisson()
     elif method == 'negative_binomial':
-        return fitter.fit_negative_binomial()
+        fit = fitter.fit_negative_binomial()
     elif method == 'empirical':
-        return fitter.fit_empirical()
+        fit = fitter.fit_empirical()
     else:
         raise ValueError(f"Unknown method: {method}")
+    
+    if isinstance(fit, EmpiricalFit):
+        # Every copy shares these arrays
+        fit.empirical_support.setflags(write=False)
+        fit.empirical_probs.setflags(write=False)
+    return fit
@@ -5,8 +5,12 @@ This script demonstrates how to use the simulator to price a contract.
 """
 
 import numpy as np
+from dataclasses import replace
 from simulator import WeatherDerivativeSimulator, create_example_contract, create_example_historical_data
 from config import ContractSpecification, PricingParameters, SimulationParameters
+from distributions import fit_distribution
+from pricing import PricingEngine
+from monte_carlo import MonteCarloSimulator
 
 
 def example_basic_pricing():
@@ -134,7 +138,15 @@ def example_step_by_step():
     pricing = sim.calculate_premium()
     print(f"âœ“ Premium calculated: ${pricing.gross_premium:,.2f}")
     print(f"\n  Breakdown:")
-    for component, value in pricing.pricing_breakdown.items():
+    breakdown = {
+        'Pure premium': pricing.pure_premium,
+        'Volatility charge': pricing.volatility_charge,
+        'Basis risk charge': pricing.basis_risk_charge,
+        'Capital charge': pricing.capital_charge,
+        'Operational cost': pricing.operational_cost,
+        'Profit': pricing.profit_amount
+    }
+    for component, value in breakdown.items():
         print(f"    {component:.<30} ${value:>10,.2f}")
     
     # Step 5: Run simulation
@@ -175,6 +187,14 @@ def example_comparison():
     # Base contract
     base_contract = create_example_contract()
     
+    # Strike only changes the payout function, so fit the distribution and
+    # draw the rainy day scenarios once and reuse them for every strike
+    distribution = fit_distribution(historical_data)
+    sim_params = SimulationParameters()
+    rainy_days = MonteCarloSimulator(
+        base_contract, distribution, historical_data, sim_params
+    ).simulate_rainy_days()
+    
     # Try different strikes
     strikes = [9, 10, 11, 12, 13]
     
@@ -182,25 +202,21 @@ def example_comparison():
     print("-" * 70)
     
     for strike in strikes:
-        contract = ContractSpecification(
-            location_lat=base_contract.location_lat,
-            location_lon=base_contract.location_lon,
-            location_name=base_contract.location_name,
-            observation_month=base_contract.observation_month,
-            observation_year=base_contract.observation_year,
-            rainfall_threshold_mm=base_contract.rainfall_threshold_mm,
-            strike_rainy_days=strike,
-            payout_rate_per_day=base_contract.payout_rate_per_day,
-            maximum_payout_days=base_contract.maximum_payout_days
-        )
+        contract = replace(base_contract, strike_rainy_days=strike)
+        
+        simulator = MonteCarloSimulator(contract, distribution, historical_data, sim_params)
+        payouts = simulator.calculate_payout(rainy_days)
         
-        sim = WeatherDerivativeSimulator()
-        results = sim.price_contract(contract, historical_data)
+        pricing = PricingEngine(contract, distribution, PricingParameters()).calculate_premium()
+        expected_roe = (
+            (pricing.gross_premium - pricing.expected_payout) /
+            pricing.capital_required * 100
+        ) if pricing.capital_required > 0 else 0
         
-        print(f"{strike:>6} | ${results['pricing']['gross_premium']:>9,.0f} | "
-              f"{results['pricing']['expected_loss_ratio']:>10.1f}% | "
-              f"{results['profitability']['expected_roe']:>8.1f}% | "
-              f"{results['simulation']['trigger_frequency'] * 100:>9.1f}%")
+        print(f"{strike:>6} | ${pricing.gross_premium:>9,.0f} | "
+              f"{pricing.expected_loss_ratio:>10.1f}% | "
+              f"{expected_roe:>8.1f}% | "
+              f"{np.mean(payouts > 0) * 100:>9.1f}%")
     
     print("\nInsights:")
     print("  â€¢ Lower strike = Higher trigger probability = Higher premium")
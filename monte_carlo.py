@@ -6,17 +6,36 @@ This module implements Monte Carlo simulation for risk analysis.
 
 import numpy as np
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, Optional, Tuple
 from config import ContractSpecification, SimulationParameters
 from distributions import DistributionFit
 
 
+# Scenarios sampled per block when samples are not stored
+_STREAMING_CHUNK_SIZE = 1 << 16
+
+
+def _percentile_positions(n: int, q: float) -> Tuple[int, int, float]:
+    """Neighbouring order-statistic indices and weight for percentile q"""
+    position = (q / 100) * (n - 1)
+    lower = int(np.floor(position))
+    upper = min(lower + 1, n - 1)
+    return lower, upper, position - lower
+
+
+def _interpolate(low_value: float, high_value: float, fraction: float) -> float:
+    """Linear interpolation in the same form as np.percentile's default"""
+    if fraction >= 0.5:
+        return high_value - (high_value - low_value) * (1 - fraction)
+    return low_value + (high_value - low_value) * fraction
+
+
 @dataclass
 class SimulationResults:
     """Results from Monte Carlo simulation"""
     n_simulations: int
-    simulated_rainy_days: np.ndarray
-    simulated_payouts: np.ndarray
+    simulated_rainy_days: Optional[np.ndarray]
+    simulated_payouts: Optional[np.ndarray]
     mean_payout: float
     std_payout: float
     min_payout: float
@@ -85,51 +104,45 @@ class MonteCarloSimulator:
         self.historical_data = historical_data
         self.params = params
 
-        # Set random seed for reproducibility
-        np.random.seed(params.random_seed)
+        # Per-instance PCG64 generator seeded for reproducibility; the seed
+        # sequence also spawns independent streams for hybrid sampling
+        self._seed_sequence = np.random.SeedSequence(params.random_seed)
+        self.rng = np.random.default_rng(self._seed_sequence)
+
+        # Payout for every rainy day count 0..strike+max_days; anything above
+        # pays the same as the last entry
+        strike = contract.strike_rainy_days
+        max_days = contract.maximum_payout_days
+        excess_days = np.clip(np.arange(strike + max_days + 1) - strike, 0, max_days)
+        self._payout_lut = excess_days * float(contract.payout_rate_per_day)
 
     def simulate_rainy_days(self) -> np.ndarray:
         """
         Simulate rainy day counts using selected method
 
+        Uses the same blocks run() processes, so both see the same scenarios
+        for the same generator state. A single integer block is returned
+        as drawn; several are copied into one array.
+
         Returns:
         --------
         simulated_days : np.ndarray
             Array of simulated rainy day counts
         """
         n = self.params.n_simulations
-
-        if self.params.method == 'bootstrap':
-            # Bootstrap: resample from historical data
-            simulated = np.random.choice(
-                self.historical_data,
-                size=n,
-                replace=True
-            )
-
-        elif self.params.method == 'parametric':
-            # Parametric: sample from fitted distribution
-            simulated = self.distribution.rvs(size=n)
-
-        elif self.params.method == 'hybrid':
-            # Hybrid: mix of bootstrap and parametric
-            n_bootstrap = int(n * self.params.bootstrap_weight)
-            n_parametric = n - n_bootstrap
-
-            bootstrap_sample = np.random.choice(
-                self.historical_data,
-                size=n_bootstrap,
-                replace=True
-            )
-            parametric_sample = self.distribution.rvs(size=n_parametric)
-
-            simulated = np.concatenate([bootstrap_sample, parametric_sample])
-            np.random.shuffle(simulated)
-
-        else:
-            raise ValueError(f"Unknown simulation method: {self.params.method}")
-
-        return simulated.astype(int)
+        chunks = self._sample_chunks()
+        first = next(chunks)
+        if len(first) == n and first.dtype.kind in 'iu':
+            return first
+
+        simulated = np.empty(n, dtype=int)
+        simulated[:len(first)] = first
+        start = len(first)
+        for rainy_days in chunks:
+            stop = start + len(rainy_days)
+            simulated[start:stop] = rainy_days
+            start = stop
+        return simulated
 
     def calculate_payout(self, rainy_days: np.ndarray) -> np.ndarray:
         """
@@ -145,18 +158,10 @@ class MonteCarloSimulator:
         payouts : np.ndarray
             Array of corresponding payouts
         """
-        strike = self.contract.strike_rainy_days
-        max_days = self.contract.maximum_payout_days
-        rate = self.contract.payout_rate_per_day
-
-        # Calculate excess days
-        excess_days = np.maximum(rainy_days - strike, 0)
-
-        # Cap at maximum payout days
-        capped_excess = np.minimum(excess_days, max_days)
-
-        # Calculate payouts
-        payouts = capped_excess * rate
+        # One gather from the payout table; mode='clip' maps counts beyond
+        # strike + max_days to the capped payout
+        payouts = np.empty(len(rainy_days), dtype=np.float64)
+        np.take(self._payout_lut, rainy_days, mode='clip', out=payouts)
 
         return payouts
 
@@ -168,6 +173,10 @@ class MonteCarloSimulator:
         """
         Calculate Value at Risk (VaR) and Conditional VaR (CVaR)
 
+        Public one-shot helper for an arbitrary payout array, e.g. payouts
+        from calculate_payout. run() does not call it: it reads the same
+        metrics from the payout counts in _summarise_payout_counts.
+
         Parameters:
         -----------
         payouts : np.ndarray
@@ -180,16 +189,27 @@ class MonteCarloSimulator:
         risk_metrics : dict
             Dictionary of VaR and CVaR values
         """
+        positions = [
+            _percentile_positions(len(payouts), level * 100)
+            for level in confidence_levels
+        ]
+        # One partition places every order statistic the VaR levels need,
+        # without sorting the whole array
+        kths = sorted({k for lower, upper, _ in positions for k in (lower, upper)})
+        order_statistics = np.partition(payouts, kths)
+
         risk_metrics = {}
 
-        for level in confidence_levels:
+        for level, (lower, upper, fraction) in zip(confidence_levels, positions):
             # VaR: percentile of loss distribution
-            var = np.percentile(payouts, level * 100)
+            var = _interpolate(
+                float(order_statistics[lower]), float(order_statistics[upper]), fraction
+            )
             risk_metrics[f'var_{int(level * 100)}'] = var
 
             # CVaR: expected loss given loss exceeds VaR
-            excess_losses = payouts[payouts >= var]
-            cvar = np.mean(excess_losses) if len(excess_losses) > 0 else var
+            excess_losses = order_statistics[order_statistics >= var]
+            cvar = float(np.mean(excess_losses)) if len(excess_losses) > 0 else var
             risk_metrics[f'cvar_{int(level * 100)}'] = cvar
 
         return risk_metrics
@@ -198,50 +218,137 @@ class MonteCarloSimulator:
         """
         Run Monte Carlo simulation
 
+        Scenarios are processed in blocks of _STREAMING_CHUNK_SIZE: each
+        block is sampled, converted to payouts and counted while it is still
+        in cache, then written to the stored arrays if params.store_samples
+        is set (otherwise the arrays in the results are None).
+
         Returns:
         --------
         results : SimulationResults
             Complete simulation results
         """
-        # Simulate rainy days
-        simulated_rainy_days = self.simulate_rainy_days()
+        n = self.params.n_simulations
+        store_samples = self.params.store_samples
+        if store_samples:
+            simulated_rainy_days = np.empty(n, dtype=int)
+            simulated_payouts = np.empty(n, dtype=np.float64)
+        else:
+            simulated_rainy_days = simulated_payouts = None
+
+        # Payouts only take the values in the payout table, so a count per
+        # table entry is an exact summary of all scenarios
+        payout_counts = np.zeros(len(self._payout_lut), dtype=np.int64)
+        start = 0
+        for rainy_days in self._sample_chunks():
+            lut_index = np.clip(rainy_days, 0, len(self._payout_lut) - 1)
+            payout_counts += np.bincount(lut_index, minlength=len(self._payout_lut))
+            if store_samples:
+                stop = start + len(rainy_days)
+                simulated_rainy_days[start:stop] = rainy_days
+                np.take(self._payout_lut, lut_index, out=simulated_payouts[start:stop])
+                start = stop
+
+        statistics = self._summarise_payout_counts(payout_counts)
 
-        # Calculate payouts
-        simulated_payouts = self.calculate_payout(simulated_rainy_days)
+        return SimulationResults(
+            n_simulations=n,
+            simulated_rainy_days=simulated_rainy_days,
+            simulated_payouts=simulated_payouts,
+            **statistics
+        )
+
+    def _sample_chunks(self):
+        """
+        Yield the simulated rainy day counts in blocks of at most
+        _STREAMING_CHUNK_SIZE
+
+        Bootstrap and parametric draws use the simulator's generator; hybrid
+        draws the bootstrap blocks, then the parametric ones, each part from
+        its own child stream. Scenarios are i.i.d. and only used in
+        aggregate, so the two parts are not shuffled together.
+        """
+        n = self.params.n_simulations
+        if self.params.method == 'bootstrap':
+            n_bootstrap = n
+            bootstrap_rng = parametric_rng = self.rng
+        elif self.params.method == 'parametric':
+            n_bootstrap = 0
+            bootstrap_rng = parametric_rng = self.rng
+        elif self.params.method == 'hybrid':
+            n_bootstrap = int(n * self.params.bootstrap_weight)
+            bootstrap_rng, parametric_rng = (
+                np.random.default_rng(child)
+                for child in self._seed_sequence.spawn(2)
+            )
+        else:
+            raise ValueError(f"Unknown simulation method: {self.params.method}")
+
+        for start in range(0, n_bootstrap, _STREAMING_CHUNK_SIZE):
+            size = min(_STREAMING_CHUNK_SIZE, n_bootstrap - start)
+            yield bootstrap_rng.choice(self.historical_data, size=size, replace=True)
+
+        n_parametric = n - n_bootstrap
+        for start in range(0, n_parametric, _STREAMING_CHUNK_SIZE):
+            size = min(_STREAMING_CHUNK_SIZE, n_parametric - start)
+            yield self.distribution.rvs_batch(size, random_state=parametric_rng)
+
+    def _summarise_payout_counts(self, payout_counts: np.ndarray) -> Dict:
+        """
+        Summary statistics from the number of scenarios per payout table entry
 
-        # Calculate statistics
-        mean_payout = float(np.mean(simulated_payouts))
-        std_payout = float(np.std(simulated_payouts))
-        min_payout = float(np.min(simulated_payouts))
-        max_payout = float(np.max(simulated_payouts))
+        Every value matches what the sorted payout array would give: the
+        k-th smallest payout is the table entry where the cumulative count
+        first exceeds k.
+        """
+        payout_values = self._payout_lut
+        n = int(payout_counts.sum())
+        cum_counts = np.cumsum(payout_counts)
+
+        def order_statistic(k):
+            # Value of the k-th smallest payout (0-based)
+            return float(payout_values[np.searchsorted(cum_counts, k, side='right')])
+
+        def percentile(q):
+            lower, upper, fraction = _percentile_positions(n, q)
+            return _interpolate(order_statistic(lower), order_statistic(upper), fraction)
+
+        mean_payout = float(payout_counts @ payout_values) / n
+        mean_sq = float(payout_counts @ (payout_values ** 2)) / n
+        std_payout = float(np.sqrt(max(mean_sq - mean_payout ** 2, 0.0)))
+
+        # Smallest and largest payouts that occurred
+        observed = np.flatnonzero(payout_counts)
+        min_payout = float(payout_values[observed[0]])
+        max_payout = float(payout_values[observed[-1]])
 
         # Trigger frequency (proportion of scenarios with payout > 0)
-        trigger_frequency = float(np.mean(simulated_payouts > 0))
+        trigger_frequency = int(payout_counts[payout_values > 0].sum()) / n
 
-        # Calculate VaR and CVaR
-        risk_metrics = self.calculate_var_cvar(simulated_payouts)
+        # VaR and CVaR
+        risk_metrics = {}
+        for level in [0.90, 0.95, 0.99]:
+            var = percentile(level * 100)
+            risk_metrics[f'var_{int(level * 100)}'] = var
 
-        # Calculate percentiles
+            # CVaR: mean payout over the scenarios at or above VaR
+            tail = payout_values >= var
+            cvar = (
+                float(payout_counts[tail] @ payout_values[tail])
+                / int(payout_counts[tail].sum())
+            )
+            risk_metrics[f'cvar_{int(level * 100)}'] = cvar
+
+        # Percentiles
         percentile_levels = [10, 25, 50, 75, 90, 95, 99]
-        percentiles = {
-            p: float(np.percentile(simulated_payouts, p))
-            for p in percentile_levels
-        }
+        percentiles = {p: percentile(p) for p in percentile_levels}
 
-        return SimulationResults(
-            n_simulations=self.params.n_simulations,
-            simulated_rainy_days=simulated_rainy_days,
-            simulated_payouts=simulated_payouts,
-            mean_payout=mean_payout,
-            std_payout=std_payout,
-            min_payout=min_payout,
-            max_payout=max_payout,
-            trigger_frequency=trigger_frequency,
-            var_90=risk_metrics['var_90'],
-            var_95=risk_metrics['var_95'],
-            var_99=risk_metrics['var_99'],
-            cvar_90=risk_metrics['cvar_90'],
-            cvar_95=risk_metrics['cvar_95'],
-            cvar_99=risk_metrics['cvar_99'],
-            percentiles=percentiles
-        )
+        return {
+            'mean_payout': mean_payout,
+            'std_payout': std_payout,
+            'min_payout': min_payout,
+            'max_payout': max_payout,
+            'trigger_frequency': trigger_frequency,
+            **risk_metrics,
+            'percentiles': percentiles
+        }
@@ -87,6 +87,12 @@ class PricingEngine:
         self.distribution = distribution
         self.params = params
 
+        # (expected, variance, std) depend only on the contract terms and the
+        # distribution, so repeated calculate_premium calls reuse them while
+        # the key stored with them still matches
+        self._payout_moments: Optional[tuple[float, float, float]] = None
+        self._payout_moments_key: Optional[tuple] = None
+
     def calculate_expected_payout(self) -> tuple[float, float, float]:
         """
         Calculate expected payout and variance
@@ -104,19 +110,23 @@ class PricingEngine:
         max_days = self.contract.maximum_payout_days
         payout_rate = self.contract.payout_rate_per_day
 
-        # Calculate expected payout by summing over all possible outcomes
-        expected_payout = 0.0
-        expected_payout_sq = 0.0
-
-        # For each possible rainy day count
-        for days in range(strike + 1, strike + max_days + 1):
-            excess_days = days - strike
-            capped_excess = min(excess_days, max_days)
-            payout = capped_excess * payout_rate
-            prob = self.distribution.pmf(days)
-
-            expected_payout += payout * prob
-            expected_payout_sq += (payout ** 2) * prob
+        # The contract is mutable, so the cache is keyed on its terms
+        key = (strike, max_days, payout_rate, id(self.distribution))
+        if self._payout_moments is not None and self._payout_moments_key == key:
+            return self._payout_moments
+
+        # Sum payout * probability over the outcomes strike+1..strike+max_days
+        # in one pmf call and two dot products
+        days = np.arange(strike + 1, strike + max_days + 1)
+        payouts = np.minimum(days - strike, max_days) * float(payout_rate)
+        pmf_table = self.distribution.pmf_table
+        if strike + max_days < len(pmf_table):
+            # Whole range inside the cached table: a slice, no evaluation
+            probs = pmf_table[strike + 1:strike + max_days + 1]
+        else:
+            probs = self.distribution.pmf(days)
+        expected_payout = float(payouts @ probs)
+        expected_payout_sq = float((payouts ** 2) @ probs)
 
         # For days exceeding strike + max_days (full payout)
         prob_extreme = 1 - self.distribution.cdf(strike + max_days)
@@ -129,7 +139,9 @@ class PricingEngine:
         variance = max(0, variance)  # Ensure non-negative
         std_dev = np.sqrt(variance)
 
-        return expected_payout, variance, std_dev
+        self._payout_moments = (expected_payout, variance, std_dev)
+        self._payout_moments_key = key
+        return self._payout_moments
 
     def calculate_premium(self, var_99: Optional[float] = None) -> PricingResults:
         """
@@ -4,8 +4,10 @@ Weather Derivative Simulator - Main Class
 This is the main interface for pricing and analyzing weather derivative contracts.
 """
 
+import math
+import multiprocessing
 import numpy as np
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple, Union
 from datetime import datetime
 import warnings
 
@@ -20,6 +22,71 @@ from pricing import PricingEngine, PricingResults, calculate_break_even_trigger_
 from monte_carlo import MonteCarloSimulator, SimulationResults
 
 
+# Text summary sections, filled with str.format_map by generate_summary
+_SUMMARY_CONTRACT_TEMPLATE = """
+{rule}
+WEATHER DERIVATIVE PRICING SUMMARY
+{rule}
+
+Contract Details:
+  Location:              {location_name}
+  Coordinates:           ({location_lat:.3f}Â°N, {location_lon:.3f}Â°E)
+  Observation Period:    {observation_month}/{observation_year}
+  Rainfall Threshold:    {rainfall_threshold_mm} mm/day
+  Strike Level:          {strike_rainy_days} rainy days
+  Payout Rate:           ${payout_rate_per_day:,.0f} per excess day
+  Maximum Payout Days:   {maximum_payout_days} days
+  Maximum Payout:        ${maximum_payout:,.0f}
+
+"""
+
+_SUMMARY_HISTORY_TEMPLATE = """Historical Analysis ({n_years} years):
+  Mean Rainy Days:       {mean_rainy_days:.1f} days
+  Std Dev:               {std_rainy_days:.1f} days
+  Historical Range:      {min_rainy_days} - {max_rainy_days} days
+  Trigger Frequency:     {historical_trigger_pct:.1f}%
+"""
+
+_SUMMARY_DISTRIBUTION_TEMPLATE = """  Fitted Distribution:   {distribution_type}
+  Distribution Mean:     {distribution_mean:.1f} days
+
+"""
+
+_SUMMARY_PRICING_TEMPLATE = """Pricing Results:
+  Pure Premium:          ${pure_premium:,.2f}
+  Volatility Loading:    ${volatility_charge:,.2f}
+  Basis Risk Loading:    ${basis_risk_charge:,.2f}
+  Technical Premium:     ${technical_premium:,.2f}
+  Capital Charge:        ${capital_charge:,.2f}
+  Operational Cost:      ${operational_cost:,.2f}
+  Profit Margin:         ${profit_amount:,.2f}
+  ---------------------
+  QUOTED PREMIUM:        ${gross_premium:,.2f}
+  
+  Premium as % Notional: {premium_as_pct_notional:.1f}%
+  Expected Loss Ratio:   {expected_loss_ratio:.1f}%
+
+"""
+
+_SUMMARY_RISK_TEMPLATE = """Risk Metrics (from {n_simulations:,} simulations):
+  Expected Payout:       ${mean_payout:,.2f}
+  Standard Deviation:    ${std_payout:,.2f}
+  Trigger Frequency:     {trigger_pct:.1f}%
+  Value at Risk (95%):   ${var_95:,.0f}
+  Value at Risk (99%):   ${var_99:,.0f}
+  CVaR (99%):            ${cvar_99:,.0f}
+  Required Capital:      ${capital_required:,.0f}
+
+"""
+
+_SUMMARY_PROFITABILITY_TEMPLATE = """Profitability:
+  Expected Profit:       ${expected_profit:,.2f}
+  Expected ROE:          {expected_roe:.1f}%
+
+{rule}
+"""
+
+
 class WeatherDerivativeSimulator:
     """
     Main simulator class for weather derivative pricing and analysis
@@ -41,7 +108,10 @@ class WeatherDerivativeSimulator:
         # Results storage
         self.contract: Optional[ContractSpecification] = None
         self.historical_data: Optional[np.ndarray] = None
+        self._historical_sorted: Optional[np.ndarray] = None
+        self.historical_statistics: Optional[Dict[str, float]] = None
         self.distribution: Optional[DistributionFit] = None
+        self.pricing_engine: Optional[PricingEngine] = None
         self.pricing_results: Optional[PricingResults] = None
         self.simulation_results: Optional[SimulationResults] = None
     
@@ -87,27 +157,72 @@ class WeatherDerivativeSimulator:
         if len(self.historical_data) < 5:
             warnings.warn("Less than 5 years of historical data - results may be unreliable")
         
-        # Calculate statistics
+        # Calculate statistics from one sort, one sum and one sum of squares
+        n_years = len(self.historical_data)
+        if n_years == 0:
+            raise ValueError("Historical data is empty")
+        sorted_counts = np.sort(self.historical_data)
+        self._historical_sorted = sorted_counts
+        total = int(sorted_counts.sum())
+        total_sq = int(np.dot(sorted_counts, sorted_counts))
+        
+        # Sample variance (ddof=1) in exact integer arithmetic
+        if n_years > 1:
+            std_rainy_days = math.sqrt(
+                (n_years * total_sq - total ** 2) / (n_years * (n_years - 1))
+            )
+        else:
+            std_rainy_days = float('nan')
+        
+        middle = n_years // 2
+        if n_years % 2:
+            median_rainy_days = float(sorted_counts[middle])
+        else:
+            median_rainy_days = (sorted_counts[middle - 1] + sorted_counts[middle]) / 2
+        
         statistics = {
-            'n_years': len(self.historical_data),
-            'mean_rainy_days': float(np.mean(self.historical_data)),
-            'std_rainy_days': float(np.std(self.historical_data, ddof=1)),
-            'min_rainy_days': int(np.min(self.historical_data)),
-            'max_rainy_days': int(np.max(self.historical_data)),
-            'median_rainy_days': float(np.median(self.historical_data))
+            'n_years': n_years,
+            'mean_rainy_days': total / n_years,
+            'std_rainy_days': std_rainy_days,
+            'min_rainy_days': int(sorted_counts[0]),
+            'max_rainy_days': int(sorted_counts[-1]),
+            'median_rainy_days': float(median_rainy_days)
         }
         
         # Calculate historical trigger frequency
         if self.contract is not None:
-            historical_triggers = np.sum(
-                self.historical_data > self.contract.strike_rainy_days
-            )
             statistics['historical_trigger_frequency'] = float(
-                historical_triggers / len(self.historical_data)
+                self.historical_trigger_frequency(self.contract.strike_rainy_days)
             )
         
+        self.historical_statistics = statistics
         return statistics
     
+    def historical_trigger_frequency(
+        self,
+        strikes: Union[int, np.ndarray]
+    ) -> Union[float, np.ndarray]:
+        """
+        Share of historical years with more rainy days than the strike
+        
+        Parameters:
+        -----------
+        strikes : int or np.ndarray
+            Strike level, or an array of strikes answered in one call
+        
+        Returns:
+        --------
+        frequency : float or np.ndarray
+            Historical trigger frequency for each strike
+        """
+        if self._historical_sorted is None:
+            raise ValueError("Historical data not set. Call set_historical_data() first.")
+        
+        # Years at or below the strike, by binary search on the sorted data
+        n_years = len(self._historical_sorted)
+        n_not_triggered = np.searchsorted(self._historical_sorted, strikes, side='right')
+        return (n_years - n_not_triggered) / n_years
+    
     def fit_distribution(self, method: str = 'auto') -> DistributionFit:
         """
         Fit probability distribution to historical data
@@ -154,11 +269,12 @@ class WeatherDerivativeSimulator:
         if pricing_params is None:
             pricing_params = PricingParameters()
         
-        # Create pricing engine
-        engine = PricingEngine(self.contract, self.distribution, pricing_params)
+        # Create pricing engine (kept for the VaR-based repricing in
+        # run_simulation)
+        self.pricing_engine = PricingEngine(self.contract, self.distribution, pricing_params)
         
         # Calculate premium (without VaR initially)
-        self.pricing_results = engine.calculate_premium(var_99=None)
+        self.pricing_results = self.pricing_engine.calculate_premium(var_99=None)
         
         return self.pricing_results
     
@@ -199,10 +315,20 @@ class WeatherDerivativeSimulator:
         # Run simulation
         self.simulation_results = simulator.run()
         
-        # Recalculate premium with actual VaR from simulation
+        # Recalculate premium with actual VaR from simulation, reusing the
+        # engine if it still prices the current contract and distribution
+        # (its expected payout cache is keyed on the contract terms, so an
+        # in-place contract edit is picked up); otherwise rebuild it with
+        # the same pricing parameters
         if self.pricing_results is not None:
-            pricing_params = PricingParameters()  # Use defaults
-            engine = PricingEngine(self.contract, self.distribution, pricing_params)
+            engine = self.pricing_engine
+            if engine is None:
+                engine = PricingEngine(self.contract, self.distribution, PricingParameters())
+                self.pricing_engine = engine
+            elif (engine.contract is not self.contract
+                    or engine.distribution is not self.distribution):
+                engine = PricingEngine(self.contract, self.distribution, engine.params)
+                self.pricing_engine = engine
             self.pricing_results = engine.calculate_premium(
                 var_99=self.simulation_results.var_99
             )
@@ -255,7 +381,7 @@ class WeatherDerivativeSimulator:
             'contract': {
                 'location': contract.location_name,
                 'latitude': contract.location_lat,
-                'longitude': contract.longitude,
+                'longitude': contract.location_lon,
                 'observation_month': contract.observation_month,
                 'observation_year': contract.observation_year,
                 'rainfall_threshold_mm': contract.rainfall_threshold_mm,
@@ -292,6 +418,60 @@ class WeatherDerivativeSimulator:
         
         return results
     
+    @classmethod
+    def price_contracts(
+        cls,
+        contracts: List[ContractSpecification],
+        historical_datasets: List[np.ndarray],
+        pricing_params: Optional[PricingParameters] = None,
+        sim_params: Optional[SimulationParameters] = None,
+        distribution_method: str = 'auto',
+        n_workers: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Price a portfolio of independent contracts across worker processes
+        
+        Each contract is priced by price_contract() on its own instance of
+        cls in a multiprocessing.Pool worker, so subclasses price with their
+        own overrides. Scripts using this on platforms that
+        spawn workers (Windows, macOS) must call it under
+        ``if __name__ == "__main__":``.
+        
+        Parameters:
+        -----------
+        contracts : list of ContractSpecification
+            Contracts to price
+        historical_datasets : list of np.ndarray
+            Historical rainy day counts, one array per contract
+        pricing_params : PricingParameters, optional
+            Pricing parameters shared by all contracts
+        sim_params : SimulationParameters, optional
+            Simulation parameters shared by all contracts
+        distribution_method : str
+            Distribution fitting method
+        n_workers : int, optional
+            Number of worker processes (defaults to the CPU count); 1 prices
+            the contracts in the current process
+        
+        Returns:
+        --------
+        results : list of dict
+            price_contract() results, in the order of contracts
+        """
+        if len(contracts) != len(historical_datasets):
+            raise ValueError("Need one historical dataset per contract")
+        
+        specs = [
+            (cls, contract, historical_data, pricing_params, sim_params, distribution_method)
+            for contract, historical_data in zip(contracts, historical_datasets)
+        ]
+        
+        if n_workers == 1 or len(specs) <= 1:
+            return [_price_one(spec) for spec in specs]
+        
+        with multiprocessing.Pool(n_workers) as pool:
+            return pool.map(_price_one, specs)
+    
     def generate_summary(self) -> str:
         """
         Generate a text summary of pricing results
@@ -304,78 +484,76 @@ class WeatherDerivativeSimulator:
         if self.contract is None or self.pricing_results is None:
             return "No pricing results available. Run price_contract() first."
         
-        summary = f"""
-{'=' * 65}
-WEATHER DERIVATIVE PRICING SUMMARY
-{'=' * 65}
-
-Contract Details:
-  Location:              {self.contract.location_name}
-  Coordinates:           ({self.contract.location_lat:.3f}Â°N, {self.contract.location_lon:.3f}Â°E)
-  Observation Period:    {self.contract.observation_month}/{self.contract.observation_year}
-  Rainfall Threshold:    {self.contract.rainfall_threshold_mm} mm/day
-  Strike Level:          {self.contract.strike_rainy_days} rainy days
-  Payout Rate:           ${self.contract.payout_rate_per_day:,.0f} per excess day
-  Maximum Payout Days:   {self.contract.maximum_payout_days} days
-  Maximum Payout:        ${self.contract.maximum_payout:,.0f}
-
-"""
-        
-        if self.historical_data is not None:
-            summary += f"""Historical Analysis ({len(self.historical_data)} years):
-  Mean Rainy Days:       {np.mean(self.historical_data):.1f} days
-  Std Dev:               {np.std(self.historical_data, ddof=1):.1f} days
-  Historical Range:      {np.min(self.historical_data)} - {np.max(self.historical_data)} days
-  Trigger Frequency:     {np.sum(self.historical_data > self.contract.strike_rainy_days) / len(self.historical_data) * 100:.1f}%
-"""
+        contract = self.contract
+        p = self.pricing_results
+        rule = '=' * 65
+        sections = [_SUMMARY_CONTRACT_TEMPLATE.format_map({
+            'rule': rule,
+            'location_name': contract.location_name,
+            'location_lat': contract.location_lat,
+            'location_lon': contract.location_lon,
+            'observation_month': contract.observation_month,
+            'observation_year': contract.observation_year,
+            'rainfall_threshold_mm': contract.rainfall_threshold_mm,
+            'strike_rainy_days': contract.strike_rainy_days,
+            'payout_rate_per_day': contract.payout_rate_per_day,
+            'maximum_payout_days': contract.maximum_payout_days,
+            'maximum_payout': contract.maximum_payout
+        })]
+        
+        if self.historical_statistics is not None:
+            # Reuse the single-pass statistics from set_historical_data; only
+            # the trigger share depends on the current contract
+            sections.append(_SUMMARY_HISTORY_TEMPLATE.format_map({
+                **self.historical_statistics,
+                'historical_trigger_pct': (
+                    self.historical_trigger_frequency(contract.strike_rainy_days) * 100
+                )
+            }))
         
         if self.distribution is not None:
-            summary += f"""  Fitted Distribution:   {self.distribution.distribution_type}
-  Distribution Mean:     {self.distribution.mean():.1f} days
-
-"""
+            sections.append(_SUMMARY_DISTRIBUTION_TEMPLATE.format_map({
+                'distribution_type': self.distribution.distribution_type,
+                'distribution_mean': self.distribution.mean()
+            }))
         
-        p = self.pricing_results
-        summary += f"""Pricing Results:
-  Pure Premium:          ${p.pure_premium:,.2f}
-  Volatility Loading:    ${p.volatility_charge:,.2f}
-  Basis Risk Loading:    ${p.basis_risk_charge:,.2f}
-  Technical Premium:     ${p.technical_premium:,.2f}
-  Capital Charge:        ${p.capital_charge:,.2f}
-  Operational Cost:      ${p.operational_cost:,.2f}
-  Profit Margin:         ${p.profit_amount:,.2f}
-  ---------------------
-  QUOTED PREMIUM:        ${p.gross_premium:,.2f}
-  
-  Premium as % Notional: {p.premium_as_pct_notional:.1f}%
-  Expected Loss Ratio:   {p.expected_loss_ratio:.1f}%
-
-"""
+        sections.append(_SUMMARY_PRICING_TEMPLATE.format_map(p.to_dict()))
         
         if self.simulation_results is not None:
             s = self.simulation_results
-            summary += f"""Risk Metrics (from {s.n_simulations:,} simulations):
-  Expected Payout:       ${s.mean_payout:,.2f}
-  Standard Deviation:    ${s.std_payout:,.2f}
-  Trigger Frequency:     {s.trigger_frequency * 100:.1f}%
-  Value at Risk (95%):   ${s.var_95:,.0f}
-  Value at Risk (99%):   ${s.var_99:,.0f}
-  CVaR (99%):            ${s.cvar_99:,.0f}
-  Required Capital:      ${p.capital_required:,.0f}
-
-"""
+            sections.append(_SUMMARY_RISK_TEMPLATE.format_map({
+                'n_simulations': s.n_simulations,
+                'mean_payout': s.mean_payout,
+                'std_payout': s.std_payout,
+                'trigger_pct': s.trigger_frequency * 100,
+                'var_95': s.var_95,
+                'var_99': s.var_99,
+                'cvar_99': s.cvar_99,
+                'capital_required': p.capital_required
+            }))
         
         profit = p.gross_premium - p.expected_payout
         roe = (profit / p.capital_required * 100) if p.capital_required > 0 else 0
         
-        summary += f"""Profitability:
-  Expected Profit:       ${profit:,.2f}
-  Expected ROE:          {roe:.1f}%
-
-{'=' * 65}
-"""
+        sections.append(_SUMMARY_PROFITABILITY_TEMPLATE.format_map({
+            'expected_profit': profit,
+            'expected_roe': roe,
+            'rule': rule
+        }))
         
-        return summary
+        return ''.join(sections)
+
+
+def _price_one(spec: Tuple) -> Dict:
+    """Price one (simulator class, contract, data, pricing, simulation, method) spec on a fresh simulator"""
+    simulator_cls, contract, historical_data, pricing_params, sim_params, distribution_method = spec
+    return simulator_cls().price_contract(
+        contract,
+        historical_data,
+        pricing_params=pricing_params,
+        sim_params=sim_params,
+        distribution_method=distribution_method
+    )
 
 
 def create_example_contract() -> ContractSpecification: